@@ -2,7 +2,6 @@
 from functools import wraps
 from pathlib import Path
 import traceback
-import yaml
 import uuid
 import logging
 import boto3
@@ -21,18 +20,10 @@ from pydantic_ai import (
 )
 from pydantic_ai.messages import ModelRequest
         
-from shellbot2.tools.botfunctions import ShellFunction, ReaderFunction, ClipboardFunction, PythonFunction, TavilySearchFunction
 from shellbot2.context_compaction import ContextCompactionConfig, compact_recent_interactions
 from shellbot2.message_history import MessageHistory
 from shellbot2.event_dispatcher import EventDispatcher, create_rich_output_dispatcher
-from shellbot2.tools.fastmailtool import FastmailTool
-from shellbot2.tools.cal import CalendarTool
-from shellbot2.tools.imagetool import ImageTool
-from shellbot2.tools.memorytool import MemoryFunction
-from shellbot2.tools.docstoretool import DocStoreTool 
-from shellbot2.tools.conversationsearchtool import ConversationSearchTool
-from shellbot2.tools.subtasktool import SubTaskTool
-from shellbot2.tools.filesearchtool import FileSearchFunction, TextReplaceFunction
+from shellbot2.util import load_conf
 
 logger = logging.getLogger(__name__)
 
@@ -93,15 +84,6 @@ def create_tool_from_schema(tool_cls):
     )
 
 
-def load_conf(datadir: Path):
-    conf = {}
-    conf_file = Path(datadir) / "agent_conf.yaml"
-    if not conf_file.exists():
-        raise FileNotFoundError(f"Agent configuration file not found: {conf_file}")
-    with open(conf_file, "r") as f:
-        conf = yaml.safe_load(f)
-    return conf
-
 def verify_aws_credentials(boto_session: boto3.Session, profile_name: str):
     """Verify that AWS credentials are present and not expired via a lightweight STS call."""
     credentials = boto_session.get_credentials()
@@ -133,7 +115,7 @@ def initialize_bedrock_model(model: str, region_name: str = 'us-west-2', aws_pro
     return BedrockConverseModel(model, provider=provider)
 
 class ShellBot3:
-    def __init__(self, datadir: Path, thread_id: str = None, event_dispatcher: EventDispatcher = None):
+    def __init__(self, datadir: Path, thread_id: str = None, event_dispatcher: EventDispatcher = None, conf: dict | None = None):
         self.message_history = MessageHistory(datadir / "message_history.db")
         if thread_id is None:
             thread_id = self.message_history.get_most_recent_thread_id()
@@ -141,7 +123,8 @@ class ShellBot3:
                 thread_id = str(uuid.uuid4())
         self.datadir = datadir
         self.thread_id = thread_id
-        self.conf = load_conf(datadir)
+        # Callers that have already loaded the config (e.g. the daemon) can pass it in
+        self.conf = conf if conf is not None else load_conf(datadir)
         logger.info(f"Config: {self.conf}")
         tools = self._create_tools()
         self.agent = self._initialize_agent(self.conf, tools)
@@ -150,24 +133,11 @@ class ShellBot3:
     def _create_tools(self):
         import importlib.util
         import sys
+        # Built-in tools are resolved lazily via TOOL_REGISTRY
+        from shellbot2.tools import TOOL_REGISTRY
         
-        # 1. Gather all built-in tools
-        available_tools = {
-            ShellFunction.toolname: ShellFunction,
-            ReaderFunction.toolname: ReaderFunction,
-            FastmailTool.toolname: FastmailTool,
-            CalendarTool.toolname: CalendarTool,
-            ImageTool.toolname: ImageTool,
-            MemoryFunction.toolname: MemoryFunction,
-            DocStoreTool.toolname: DocStoreTool,
-            ClipboardFunction.toolname: ClipboardFunction,
-            PythonFunction.toolname: PythonFunction,
-            TavilySearchFunction.toolname: TavilySearchFunction,
-            SubTaskTool.toolname: SubTaskTool,
-            ConversationSearchTool.toolname: ConversationSearchTool,
-            FileSearchFunction.toolname: FileSearchFunction,
-            TextReplaceFunction.toolname: TextReplaceFunction,
-        }
+        # 1. Custom tools found below take precedence over built-ins of the same name
+        custom_tools = {}
 
         # 2. Discover custom tools in self.datadir / "tools"
         custom_tools_dir = self.datadir / "tools"
@@ -197,7 +167,7 @@ class ShellBot3:
                                 toolname_val = toolname_attr
                                 
                             if isinstance(toolname_val, str) and toolname_val:
-                                available_tools[toolname_val] = attr
+                                custom_tools[toolname_val] = attr
                                 logger.info(f"Loaded custom tool '{toolname_val}' from {py_file}")
                 except Exception as e:
                     logger.error(f"Failed to load custom tools from {py_file}: {e}")
@@ -207,7 +177,7 @@ class ShellBot3:
         if not configured_tools:
             # Fallback to all built-in tools for backward compatibility
             logger.warning("No 'tools' section in agent_conf.yaml. Loading all default tools.")
-            configured_tools = list(available_tools.keys())
+            configured_tools = list(dict.fromkeys([*TOOL_REGISTRY, *custom_tools]))
 
         tools = []
         for tool_entry in configured_tools:
@@ -225,23 +195,23 @@ class ShellBot3:
                 logger.warning(f"Invalid tool configuration entry: {tool_entry}")
                 continue
 
-            if tool_name not in available_tools:
+            is_builtin = tool_name not in custom_tools
+            if is_builtin and tool_name not in TOOL_REGISTRY:
                 logger.warning(f"Tool '{tool_name}' requested in config but not found.")
                 continue
 
-            tool_cls = available_tools[tool_name]
-
             # Inject required kwargs for specific built-in tools
-            if tool_cls == SubTaskTool:
+            if is_builtin and tool_name == "subtasks":
                 if 'modules_dir' not in tool_kwargs:
                     tool_kwargs['modules_dir'] = self.datadir / "subtask_modules"
                 if 'zmq_input_address' not in tool_kwargs:
                     tool_kwargs['zmq_input_address'] = self.conf.get('input_address', 'tcp://127.0.0.1:5555')
-            elif tool_cls == ConversationSearchTool:
+            elif is_builtin and tool_name == "conversation-search":
                 if 'message_history' not in tool_kwargs:
                     tool_kwargs['message_history'] = self.message_history
 
             try:
+                tool_cls = TOOL_REGISTRY[tool_name] if is_builtin else custom_tools[tool_name]
                 tool_instance = tool_cls(**tool_kwargs)
                 tools.append(create_tool_from_schema(tool_instance))
                 logger.debug(f"Initialized tool '{tool_name}'")
@@ -301,7 +271,7 @@ class ShellBot3:
                 runresult = result
                 user_model_message = ModelRequest.user_text_prompt(prompt)
                 new_messages = [user_model_message] + (result.new_messages() if result else [])
-                new_messages = [to_jsonable_python(m) for m in new_messages]
+                new_messages = to_jsonable_python(new_messages)
                 self.message_history.add_interaction(self.thread_id, new_messages)
             except Exception as e:
                 import traceback, sys
@@ -318,7 +288,7 @@ class ShellBot3:
 
         adapter = AGUIAdapter(self.agent, run_input=run_input)
         async for event in adapter.run_stream(message_history=recent_messages, on_complete=on_complete):
-            logger.debug(f"Event: {event}")
+            logger.debug("Event: %s", event)
             self.event_dispatcher.dispatch(event)
 
         if runresult is None:
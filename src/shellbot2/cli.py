@@ -1,22 +1,22 @@
 import argparse
 import asyncio
+import inspect
 import logging
 import os
 import signal
 import sys
 import uuid
 from pathlib import Path
+from types import MappingProxyType
 from datetime import datetime
 import time
 import zmq
 from dotenv import load_dotenv
 
 from ag_ui.core import BaseEvent
-from shellbot2.agent import ShellBot3, load_conf
 from shellbot2.event_dispatcher import create_rich_output_dispatcher, RichOutputHandler
-from shellbot2.memory_extractor import MemoryExtractor
 from shellbot2.message_history import MessageHistory
-from shellbot2.tools.memorytool import MemoryTool
+from shellbot2.util import load_conf
 
 load_dotenv()
 
@@ -63,6 +63,8 @@ def get_ask_presence_file(datadir: Path) -> Path:
 
 async def run_prompt(args: argparse.Namespace) -> None:
     """Run a prompt directly through the agent."""
+    from shellbot2.agent import ShellBot3
+    
     logger = logging.getLogger(__name__)
     logger.info(f"Running prompt: {args.prompt[:100]}...")
     
@@ -315,6 +317,9 @@ async def daemon_watch(args: argparse.Namespace) -> None:
 
 async def extract_memories(args: argparse.Namespace) -> None:
     """Extract memories from conversation history and store them."""
+    from shellbot2.memory_extractor import MemoryExtractor
+    from shellbot2.tools.memorytool import MemoryTool
+    
     logger = logging.getLogger(__name__)
 
     conf = load_conf(args.datadir)
@@ -442,6 +447,20 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
+# Subcommand handlers, looked up by the parsed command name. Handlers may be
+# plain functions or coroutine functions.
+COMMAND_HANDLERS = MappingProxyType({
+    'ask': run_prompt,
+    'extract-memories': extract_memories,
+})
+DAEMON_HANDLERS = MappingProxyType({
+    'start': daemon_start,
+    'stop': daemon_stop,
+    'ask': daemon_ask,
+    'watch': daemon_watch,
+})
+
+
 async def main() -> None:
     parser = build_parser()
     
@@ -457,24 +476,40 @@ async def main() -> None:
     logger = logging.getLogger(__name__)
     logger.info(f"CLI started with command: {args.command}")
     
-    if args.command == 'ask':
-        await run_prompt(args)
-    elif args.command == 'daemon':
-        if args.daemon_command == 'start':
-            await daemon_start(args)
-        elif args.daemon_command == 'stop':
-            daemon_stop(args)
-        elif args.daemon_command == 'ask':
-            await daemon_ask(args)
-        elif args.daemon_command == 'watch':
-            await daemon_watch(args)
-        else:
+    if args.command == 'daemon':
+        handler = DAEMON_HANDLERS.get(args.daemon_command)
+        if handler is None:
             parser.parse_args(['daemon', '--help'])
-    elif args.command == 'extract-memories':
-        await extract_memories(args)
+            return
+    else:
+        handler = COMMAND_HANDLERS.get(args.command)
+        if handler is None:
+            parser.print_help()
+            return
+    
+    result = handler(args)
+    if inspect.isawaitable(result):
+        await result
+
+
+def run_event_loop(coro) -> None:
+    """Run a coroutine on uvloop when it is installed, otherwise on the stdlib loop.
+    
+    uvloop is optional; it speeds up socket scheduling for the daemon's
+    ZeroMQ receive loop but is not available on every platform.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(coro)
+        return
+    if hasattr(uvloop, "run"):
+        uvloop.run(coro)
     else:
-        parser.print_help()
+        # uvloop.run() was added in 0.18; older versions only offer install()
+        uvloop.install()
+        asyncio.run(coro)
 
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    run_event_loop(main())
@@ -19,8 +19,10 @@ import logging
 
 import zmq
 import zmq.asyncio
+from pydantic import TypeAdapter
 
-from shellbot2.agent import ShellBot3, load_conf
+from shellbot2.agent import ShellBot3
+from shellbot2.util import load_conf
 from shellbot2.event_dispatcher import create_zeromq_dispatcher
 
 
@@ -35,30 +37,25 @@ class InputMessage:
     thread_id: str | None = None
     
     @classmethod
-    def from_json(cls, json_str: str) -> "InputMessage":
-        """Parse an InputMessage from a JSON string.
+    def from_json(cls, json_data: str | bytes) -> "InputMessage":
+        """Parse an InputMessage from a JSON string or raw bytes.
+        
+        Parsing and validation happen in a single pydantic-core pass.
         
         Args:
-            json_str: JSON-encoded string with prompt, source, and datetime fields.
+            json_data: JSON-encoded string or bytes with prompt, source, and datetime fields.
             
         Returns:
             An InputMessage instance.
             
         Raises:
-            ValueError: If required fields are missing.
-            json.JSONDecodeError: If the string is not valid JSON.
+            ValueError: If the data is not valid JSON, or required fields are
+                missing or have the wrong type (pydantic's ValidationError is a ValueError).
         """
-        data = json.loads(json_str)
-        required_fields = {"prompt", "source", "datetime"}
-        missing = required_fields - set(data.keys())
-        if missing:
-            raise ValueError(f"Missing required fields: {missing}")
-        return cls(
-            prompt=data["prompt"],
-            source=data["source"],
-            datetime=data["datetime"],
-            thread_id=data.get("thread_id"),
-        )
+        return _INPUT_MESSAGE_ADAPTER.validate_json(json_data)
+
+
+_INPUT_MESSAGE_ADAPTER = TypeAdapter(InputMessage)
 
 
 class AgentDaemon:
@@ -99,6 +96,8 @@ class AgentDaemon:
         # return coroutines from send_string() which would silently drop msgs.
         self._sync_context = zmq.Context()
         self._output_socket = self._sync_context.socket(zmq.PUB)
+        # Larger send queue so bursts of streamed deltas aren't dropped for slow subscribers
+        self._output_socket.setsockopt(zmq.SNDHWM, 10000)
         self._output_socket.bind(self.output_address)
         
         self.dispatcher = create_zeromq_dispatcher(socket=self._output_socket)
@@ -107,6 +106,7 @@ class AgentDaemon:
         self.agent = ShellBot3(
             datadir=self.datadir,
             event_dispatcher=self.dispatcher,
+            conf=conf,
         )
         self.logger = logging.getLogger(__name__)
         self.logger.info(f"AgentDaemon initialized with datadir={datadir}, input_address={self.input_address}, output_address={self.output_address}")
@@ -121,6 +121,8 @@ class AgentDaemon:
         
         # Input socket: async PULL socket to receive InputMessages
         self._input_socket = self._async_context.socket(zmq.PULL)
+        self._input_socket.setsockopt(zmq.RCVHWM, 10000)
+        self._input_socket.setsockopt(zmq.LINGER, 0)
         self._input_socket.bind(self.input_address)
         
         # Output socket is already bound in __init__ (sync socket)
@@ -136,10 +138,10 @@ class AgentDaemon:
             try:
                 # Wait for incoming message
                 message_bytes = await self._input_socket.recv()
-                message_str = message_bytes.decode("utf-8")
-                logger.info(f"Received message: {message_str[:100]}...")
+                # Only the logged prefix is decoded; validation reads the raw bytes
+                logger.info(f"Received message: {message_bytes[:100].decode('utf-8', errors='replace')}...")
                 
-                await self._handle_message(message_str)
+                await self._handle_message(message_bytes)
                 
             except zmq.ZMQError as e:
                 if self._running:
@@ -148,14 +150,14 @@ class AgentDaemon:
                 self.logger.info("Daemon cancelled")
                 break
     
-    async def _handle_message(self, message_str: str) -> None:
+    async def _handle_message(self, message_data: bytes | str) -> None:
         """Process an incoming message.
         
         Args:
-            message_str: The raw message string received from ZeroMQ.
+            message_data: The raw message bytes (or string) received from ZeroMQ.
         """
         try:
-            input_message = InputMessage.from_json(message_str)
+            input_message = InputMessage.from_json(message_data)
         except (json.JSONDecodeError, ValueError) as e:
             self.logger.error(f"Invalid message received: {e}")
             return
@@ -93,9 +93,11 @@ class ZeroMQEventHandler(EventHandler):
         Args:
             event: The AG-UI event to publish.
         """
-        # Use Pydantic's built-in JSON serialization
-        event_json = event.model_dump_json()
-        self._socket.send_string(event_json)
+        # Use Pydantic's built-in JSON serialization, and hand the encoded
+        # buffer to ZeroMQ without an extra copy (pyzmq still copies small
+        # frames below its copy threshold, so this is never slower).
+        event_bytes = event.model_dump_json().encode("utf-8")
+        self._socket.send(event_bytes, copy=False)
     
     def cleanup(self) -> None:
         """Clean up ZeroMQ resources if this handler owns them."""
@@ -17,9 +17,10 @@ from typing import Optional
 from pydantic import BaseModel, Field
 from pydantic_ai import Agent
 
-from shellbot2.agent import initialize_bedrock_model, load_conf
+from shellbot2.agent import initialize_bedrock_model
 from shellbot2.message_history import MessageHistory
 from shellbot2.tools.memorytool import MemoryTool
+from shellbot2.util import load_conf
 
 logger = logging.getLogger(__name__)
 
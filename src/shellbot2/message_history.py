@@ -9,18 +9,49 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
-import json
 import logging
 import re
+import time
 import uuid
 
+from pydantic_core import from_json, to_json
 from rank_bm25 import BM25Okapi
 
-from sqlalchemy import Column, DateTime, Integer, String, Text, create_engine, desc
+from sqlalchemy import (
+    Column, DateTime, Index, Integer, String, Text,
+    cast, create_engine, desc, event, func, insert, literal, select,
+)
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 logger = logging.getLogger(__name__)
 
+# How long get_thread_ids may serve a cached result, in seconds
+THREAD_IDS_CACHE_TTL = 30.0
+
+
+def _configure_sqlite_connection(dbapi_connection, connection_record) -> None:
+    """Configure each new SQLite connection for faster commits.
+    
+    WAL turns each commit into a log append (and lets readers proceed while a
+    write is in progress); synchronous=NORMAL is durable across application
+    crashes in WAL mode and only skips the fsync on every commit.
+    
+    Write transactions are opened with BEGIN IMMEDIATE, so the write lock is
+    taken up front rather than upgraded mid-transaction, where a concurrent
+    writer would make the commit fail with "database is locked".
+    """
+    # The sqlite3 driver only emits BEGIN before INSERT/UPDATE/DELETE, so plain
+    # reads are unaffected by this.
+    dbapi_connection.isolation_level = "IMMEDIATE"
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-20000")
+    cursor.close()
+
+
 class Base(DeclarativeBase):
     """Base class for SQLAlchemy models."""
     pass
@@ -38,6 +69,10 @@ class Message(Base):
         created_at: Timestamp when the message was added
     """
     __tablename__ = "messages"
+    __table_args__ = (
+        # Matches the thread history queries: filter on thread_id, order by created_at
+        Index("ix_messages_thread_id_created_at", "thread_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     thread_id = Column(String, nullable=False, index=True)
@@ -84,15 +119,41 @@ class MessageHistory:
         Args:
             db_path: Path to the SQLite database file. If None, creates an in-memory database.
         """
-        if db_path is None:
+        if db_path is None or str(db_path) == ":memory:":
+            db_path = None
             db_url = "sqlite:///:memory:"
+            engine_kwargs = {}
         else:
             db_path = Path(db_path)
             db_url = f"sqlite:///{db_path}"
-        logger.info(f"Creating engine with db_url: {db_url}")
-        self.engine = create_engine(db_url)
+            # Hand back the most recently used connection first so callers get
+            # one that already has the PRAGMAs applied and a warm page cache.
+            engine_kwargs = {
+                "pool_size": 8,
+                "max_overflow": 8,
+                "pool_use_lifo": True,
+                "connect_args": {"check_same_thread": False},
+            }
+        logger.info("Creating engine with db_url: %s", db_url)
+        self.engine = create_engine(db_url, **engine_kwargs)
+        if db_path is not None:
+            event.listen(self.engine, "connect", _configure_sqlite_connection)
         Base.metadata.create_all(self.engine)
+        # create_all() skips indexes on tables that already exist, so make sure
+        # indexes added after a database was first created are present too.
+        for index in Message.__table__.indexes:
+            index.create(self.engine, checkfirst=True)
         self.SessionLocal = sessionmaker(bind=self.engine)
+        # (expiry time, thread ids) for get_thread_ids; cleared when we write to
+        # a thread that isn't in it, and expires so writes from other processes
+        # show up eventually.
+        self._thread_ids_cache: Optional[tuple[float, list[str]]] = None
+    
+    def _invalidate_thread_ids(self, thread_id: str) -> None:
+        """Drop the cached thread id list if thread_id is not already in it."""
+        cached = self._thread_ids_cache
+        if cached is not None and thread_id not in cached[1]:
+            self._thread_ids_cache = None
     
     def add_message(self, thread_id: str, message: str) -> int:
         """
@@ -105,22 +166,22 @@ class MessageHistory:
         Returns:
             The ID of the newly created message
         """
-        with self.SessionLocal() as session:
-            msg = Message(
-                thread_id=thread_id,
-                message=json.dumps(message),
-                created_at=datetime.now()
-            )
-            session.add(msg)
-            session.commit()
-            session.refresh(msg)
-            return msg.id
+        # Core insert skips the ORM unit of work and the refresh() SELECT
+        stmt = insert(Message).values(
+            thread_id=thread_id,
+            message=to_json(message).decode(),
+            created_at=datetime.now(),
+        )
+        with self.engine.begin() as conn:
+            result = conn.execute(stmt)
+        self._invalidate_thread_ids(thread_id)
+        return result.inserted_primary_key[0]
     
     def add_messages(self, thread_id: str, messages: list[str]) -> list[int]:
         """
         Add multiple messages to the database.
         
-        All messages will have the same thread_id but each will have its own timestamp.
+        All messages will have the same thread_id and share a single timestamp.
         
         Args:
             thread_id: Identifier for the conversation thread
@@ -129,20 +190,20 @@ class MessageHistory:
         Returns:
             List of IDs of the newly created messages
         """
-        print(f"Adding messages: {messages}")
-        with self.SessionLocal() as session:
-            msg_objects = []
-            for message in messages:
-                msg = Message(
-                    thread_id=thread_id,
-                    message=json.dumps(message),
-                    created_at=datetime.now()
-                )
-                session.add(msg)
-                msg_objects.append(msg)
-            
-            session.commit()
-            return [msg.id for msg in msg_objects]
+        now = datetime.now()
+        rows = [
+            {"thread_id": thread_id, "message": to_json(message).decode(), "created_at": now}
+            for message in messages
+        ]
+        if not rows:
+            return []
+        
+        # One batched INSERT ... RETURNING, with ids in the same order as `messages`
+        stmt = insert(Message).returning(Message.id, sort_by_parameter_order=True)
+        with self.engine.begin() as conn:
+            ids = list(conn.execute(stmt, rows).scalars())
+        self._invalidate_thread_ids(thread_id)
+        return ids
 
     def add_interaction(self, thread_id: str, messages: list[str] | str) -> str:
         """
@@ -163,18 +224,23 @@ class MessageHistory:
         
         interaction_id = str(uuid.uuid4())
         
-        with self.SessionLocal() as session:
-            for message in messages:
-                msg = Message(
-                    thread_id=thread_id,
-                    interaction_id=interaction_id,
-                    message=json.dumps(message),
-                    created_at=datetime.now()
-                )
-                session.add(msg)
-            
-            session.commit()
-            return interaction_id
+        # Serialize before opening the transaction to keep the write window short
+        now = datetime.now()
+        rows = [
+            {
+                "thread_id": thread_id,
+                "interaction_id": interaction_id,
+                "message": to_json(message).decode(),
+                "created_at": now,
+            }
+            for message in messages
+        ]
+        
+        # A single executemany INSERT inside one transaction
+        with self.engine.begin() as conn:
+            conn.execute(insert(Message), rows)
+        self._invalidate_thread_ids(thread_id)
+        return interaction_id
 
     def get_all_interactions(self, thread_id: str) -> list[Interaction]:
         """
@@ -194,83 +260,125 @@ class MessageHistory:
             messages = (
                 session.query(Message)
                 .filter(Message.thread_id == thread_id)
-                .order_by(Message.created_at)
+                .order_by(Message.created_at, Message.id)
                 .all()
             )
+            return self._group_into_interactions(thread_id, messages)
+
+    @staticmethod
+    def _interaction_key():
+        """SQL expression for a message's interaction grouping key.
+        
+        Mirrors _group_into_interactions: messages without an interaction_id
+        (NULL or empty) each form their own "standalone-<id>" interaction.
+        """
+        return func.coalesce(
+            func.nullif(Message.interaction_id, ""),
+            literal("standalone-") + cast(Message.id, String),
+        )
+
+    @staticmethod
+    def _group_into_interactions(thread_id: str, messages: list[Message]) -> list[Interaction]:
+        """
+        Group messages (ordered oldest first) into Interaction objects.
+        
+        Args:
+            thread_id: The thread the messages belong to
+            messages: Message rows ordered by creation time
             
-            # Group messages by interaction_id
-            interactions_dict: dict[str, list[Message]] = {}
-            standalone_messages: list[Message] = []
-            
-            for msg in messages:
-                if msg.interaction_id:
-                    if msg.interaction_id not in interactions_dict:
-                        interactions_dict[msg.interaction_id] = []
-                    interactions_dict[msg.interaction_id].append(msg)
-                else:
-                    standalone_messages.append(msg)
-            
-            # Build Interaction objects
-            result: list[Interaction] = []
-            
-            # Add grouped interactions
-            for interaction_id, msgs in interactions_dict.items():
-                interaction = Interaction(
-                    interaction_id=interaction_id,
-                    thread_id=thread_id,
-                    messages=[
-                        Message(
-                            id=m.id,
-                            thread_id=m.thread_id,
-                            interaction_id=m.interaction_id,
-                            message=json.loads(m.message),
-                            created_at=m.created_at
-                        )
-                        for m in msgs
-                    ],
-                    created_at=msgs[0].created_at.isoformat() if msgs else None
-                )
-                result.append(interaction)
-            
-            # Add standalone messages as single-message interactions
-            for msg in standalone_messages:
-                interaction = Interaction(
-                    interaction_id=f"standalone-{msg.id}",
-                    thread_id=thread_id,
-                    messages=[
-                        Message(
-                            id=msg.id,
-                            thread_id=msg.thread_id,
-                            interaction_id=None,
-                            message=json.loads(msg.message),
-                            created_at=msg.created_at
-                        )
-                    ],
-                    created_at=msg.created_at.isoformat()
-                )
-                result.append(interaction)
-            
-            # Sort all interactions by created_at
-            result.sort(key=lambda x: x.created_at or "")
-            
-            return result
+        Returns:
+            List of Interaction objects, ordered by the creation time of their first message.
+        """
+        # Group messages by interaction_id
+        interactions_dict: dict[str, list[Message]] = {}
+        standalone_messages: list[Message] = []
+        
+        for msg in messages:
+            if msg.interaction_id:
+                if msg.interaction_id not in interactions_dict:
+                    interactions_dict[msg.interaction_id] = []
+                interactions_dict[msg.interaction_id].append(msg)
+            else:
+                standalone_messages.append(msg)
+        
+        # Build Interaction objects
+        result: list[Interaction] = []
+        
+        # Add grouped interactions
+        for interaction_id, msgs in interactions_dict.items():
+            interaction = Interaction(
+                interaction_id=interaction_id,
+                thread_id=thread_id,
+                messages=[
+                    Message(
+                        id=m.id,
+                        thread_id=m.thread_id,
+                        interaction_id=m.interaction_id,
+                        message=from_json(m.message),
+                        created_at=m.created_at
+                    )
+                    for m in msgs
+                ],
+                created_at=msgs[0].created_at.isoformat() if msgs else None
+            )
+            result.append(interaction)
+        
+        # Add standalone messages as single-message interactions
+        for msg in standalone_messages:
+            interaction = Interaction(
+                interaction_id=f"standalone-{msg.id}",
+                thread_id=thread_id,
+                messages=[
+                    Message(
+                        id=msg.id,
+                        thread_id=msg.thread_id,
+                        interaction_id=None,
+                        message=from_json(msg.message),
+                        created_at=msg.created_at
+                    )
+                ],
+                created_at=msg.created_at.isoformat()
+            )
+            result.append(interaction)
+        
+        # Sort all interactions by created_at
+        result.sort(key=lambda x: x.created_at or "")
+        
+        return result
 
     def get_recent_interactions(self, thread_id: str, limit: int, messages_only: bool = False) -> list[Interaction]:
         """
         Retrieve the most recent N interactions for a given thread.
         
+        The interaction window is selected in SQL, so only the rows belonging to
+        the most recent interactions are loaded and JSON-decoded.
+        
         Args:
             thread_id: Identifier for the conversation thread
-            limit: Maximum number of interactions to return
+            limit: Maximum number of interactions to return; 0 returns all of them
             messages_only: If True, return only the messages in the Interactions, not the Interactions themselves
             
         Returns:
             List of the most recent Interaction objects, ordered from oldest to newest.
         """
-        all_interactions = self.get_all_interactions(thread_id)
-        if limit >= len(all_interactions):
-            limit = len(all_interactions)
-        interactions = all_interactions[-limit:]
+        interaction_key = self._interaction_key()
+        with self.SessionLocal() as session:
+            recent_keys = (
+                select(interaction_key)
+                .where(Message.thread_id == thread_id)
+                .group_by(interaction_key)
+                .order_by(desc(func.min(Message.created_at)), desc(func.min(Message.id)))
+            )
+            if limit > 0:
+                recent_keys = recent_keys.limit(limit)
+            messages = (
+                session.query(Message)
+                .filter(Message.thread_id == thread_id)
+                .filter(interaction_key.in_(recent_keys.scalar_subquery()))
+                .order_by(Message.created_at, Message.id)
+                .all()
+            )
+            interactions = self._group_into_interactions(thread_id, messages)
         if messages_only:
             all_messages = [
                 msg
@@ -298,42 +406,50 @@ class MessageHistory:
             List of dictionaries containing message data, ordered from oldest to newest.
             Each dictionary contains: id, thread_id, message, and created_at.
         """
-        with self.SessionLocal() as session:
-            query = session.query(Message).filter(Message.thread_id == thread_id)
-            
-            if limit is not None:
-                # Get the most recent N messages, but return them in chronological order
-                messages = (
-                    query.order_by(desc(Message.created_at))
-                    .limit(limit)
-                    .all()
-                )
-                # Reverse to get chronological order (oldest first)
-                messages = list(reversed(messages))
-            else:
-                # Get all messages in chronological order
-                messages = query.order_by(Message.created_at).all()
-            
+        stmt = select(
+            Message.id, Message.thread_id, Message.message, Message.created_at
+        ).where(Message.thread_id == thread_id)
+        if limit is not None:
+            # Pick the most recent N messages by id in a subquery and sort them
+            # back into chronological order in SQL, so no reversal is needed here.
+            recent = stmt.order_by(desc(Message.id)).limit(limit).subquery()
+            stmt = select(recent).order_by(recent.c.id)
+        else:
+            # Get all messages in chronological order
+            stmt = stmt.order_by(Message.created_at, Message.id)
+        
+        with self.engine.connect() as conn:
+            rows = conn.execute(stmt).yield_per(500)
             return [
                 {
-                    "id": msg.id,
-                    "thread_id": msg.thread_id,
-                    "message": json.loads(msg.message),
-                    "created_at": msg.created_at.isoformat()
+                    "id": msg_id,
+                    "thread_id": msg_thread_id,
+                    "message": from_json(message),
+                    "created_at": created_at.isoformat()
                 }
-                for msg in messages
+                for msg_id, msg_thread_id, message, created_at in rows
             ]
 
     def get_thread_ids(self) -> list[str]:
         """
         Get a list of all unique thread IDs in the database.
         
+        The result is cached for THREAD_IDS_CACHE_TTL seconds.
+        
         Returns:
             List of unique thread IDs
         """
-        with self.SessionLocal() as session:
-            result = session.query(Message.thread_id).distinct().all()
-            return [row[0] for row in result]
+        cached = self._thread_ids_cache
+        if cached is not None and cached[0] > time.monotonic():
+            return list(cached[1])
+        
+        # GROUP BY lets SQLite read each distinct value straight off the
+        # thread_id index without a separate sort
+        stmt = select(Message.thread_id).group_by(Message.thread_id)
+        with self.engine.connect() as conn:
+            thread_ids = list(conn.execute(stmt).scalars())
+        self._thread_ids_cache = (time.monotonic() + THREAD_IDS_CACHE_TTL, thread_ids)
+        return list(thread_ids)
     
     def count_messages(self, thread_id: Optional[str] = None) -> int:
         """
@@ -346,11 +462,13 @@ class MessageHistory:
         Returns:
             Number of messages
         """
-        with self.SessionLocal() as session:
-            query = session.query(Message)
-            if thread_id is not None:
-                query = query.filter(Message.thread_id == thread_id)
-            return query.count()
+        # A direct count, rather than Query.count()'s count over a subquery, so
+        # SQLite can answer it from the thread_id index alone
+        stmt = select(func.count(Message.id))
+        if thread_id is not None:
+            stmt = stmt.where(Message.thread_id == thread_id)
+        with self.engine.connect() as conn:
+            return conn.execute(stmt).scalar_one()
     
     def get_most_recent_thread_id(self) -> Optional[str]:
         """
@@ -362,7 +480,7 @@ class MessageHistory:
         with self.SessionLocal() as session:
             most_recent = (
                 session.query(Message)
-                .order_by(desc(Message.created_at))
+                .order_by(desc(Message.id))
                 .first()
             )
             return most_recent.thread_id if most_recent else None
@@ -427,7 +545,7 @@ class MessageHistory:
             query = session.query(Message)
             if thread_id is not None:
                 query = query.filter(Message.thread_id == thread_id)
-            messages = query.order_by(Message.created_at).all()
+            messages = query.order_by(Message.created_at, Message.id).all()
             return [
                 (msg.id, msg.thread_id, msg.message, msg.created_at)
                 for msg in messages
@@ -462,7 +580,7 @@ class MessageHistory:
             return []
         
         msg_id, thread_id, message_json, created_at = all_messages[idx]
-        message = json.loads(message_json)
+        message = from_json(message_json)
         kind = message.get("kind", "")
         
         pair = []
@@ -470,13 +588,13 @@ class MessageHistory:
             # This is a user message, include it and the next response if exists
             pair.append(all_messages[idx])
             if idx + 1 < len(all_messages):
-                next_msg = json.loads(all_messages[idx + 1][2])
+                next_msg = from_json(all_messages[idx + 1][2])
                 if next_msg.get("kind") == "response":
                     pair.append(all_messages[idx + 1])
         elif kind == "response":
             # This is an assistant message, include previous request and this
             if idx > 0:
-                prev_msg = json.loads(all_messages[idx - 1][2])
+                prev_msg = from_json(all_messages[idx - 1][2])
                 if prev_msg.get("kind") == "request":
                     pair.append(all_messages[idx - 1])
             pair.append(all_messages[idx])
@@ -509,7 +627,7 @@ class MessageHistory:
         lines = [f"--- Conversation from {formatted_time} ---"]
         
         for _, _, message_json, _ in pair:
-            message = json.loads(message_json)
+            message = from_json(message_json)
             kind = message.get("kind", "")
             content = MessageHistory._extract_searchable_content(message)
             
@@ -557,7 +675,7 @@ class MessageHistory:
         corpus = []
         message_ids = []
         for msg_id, _, message_json, _ in all_messages:
-            message = json.loads(message_json)
+            message = from_json(message_json)
             content = self._extract_searchable_content(message)
             if content.strip():  # Only index messages with searchable content
                 corpus.append(self._tokenize(content))
@@ -2,11 +2,86 @@
 Tools package for shellbot.
 
 This package contains all tool modules that can be used by assistants.
+
+Tool modules pull in heavy third-party clients (tavily, gcsa, genai, ...), so
+nothing is imported up front: submodules load on first attribute access, and
+TOOL_REGISTRY only imports a tool's module when that tool is looked up.
 """
 
-from . import botfunctions, memorytool, docstoretool
-from . import fastmailtool, cal, imagetool, conversationsearchtool
-from . import filesearchtool
+import importlib
+from collections.abc import Iterator, Mapping
+from functools import lru_cache
+from types import MappingProxyType
+
+# Built-in tools: toolname -> (module, class name)
+TOOL_IMPORT_PATHS: Mapping[str, tuple[str, str]] = MappingProxyType({
+    "shell": ("shellbot2.tools.botfunctions", "ShellFunction"),
+    "reader": ("shellbot2.tools.botfunctions", "ReaderFunction"),
+    "fastmail": ("shellbot2.tools.fastmailtool", "FastmailTool"),
+    "calendar": ("shellbot2.tools.cal", "CalendarTool"),
+    "image-generator": ("shellbot2.tools.imagetool", "ImageTool"),
+    "memory": ("shellbot2.tools.memorytool", "MemoryFunction"),
+    "document-store": ("shellbot2.tools.docstoretool", "DocStoreTool"),
+    "clipboard": ("shellbot2.tools.botfunctions", "ClipboardFunction"),
+    "python": ("shellbot2.tools.botfunctions", "PythonFunction"),
+    "tavilysearch": ("shellbot2.tools.botfunctions", "TavilySearchFunction"),
+    "subtasks": ("shellbot2.tools.subtasktool", "SubTaskTool"),
+    "conversation-search": ("shellbot2.tools.conversationsearchtool", "ConversationSearchTool"),
+    "file_search": ("shellbot2.tools.filesearchtool", "FileSearchFunction"),
+    "text_replace": ("shellbot2.tools.filesearchtool", "TextReplaceFunction"),
+})
+_SORTED_TOOL_NAMES = tuple(sorted(TOOL_IMPORT_PATHS))
+
+
+@lru_cache(maxsize=None)
+def resolve_tool_class(name: str) -> type:
+    """Import and return the class for a built-in tool. Raises KeyError for unknown names."""
+    module_name, class_name = TOOL_IMPORT_PATHS[name]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+class _ToolRegistry(Mapping):
+    """Read-only toolname -> tool class mapping that imports each tool on first lookup."""
+
+    def __getitem__(self, name: str) -> type:
+        return resolve_tool_class(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(TOOL_IMPORT_PATHS)
+
+    def __len__(self) -> int:
+        return len(TOOL_IMPORT_PATHS)
+
+    def __contains__(self, name: object) -> bool:
+        return name in TOOL_IMPORT_PATHS
+
+
+TOOL_REGISTRY = _ToolRegistry()
+
+
+def get_available_tool_names() -> list[str]:
+    """Return the names of all built-in tools, sorted."""
+    return list(_SORTED_TOOL_NAMES)
+
+
+_SUBMODULES = frozenset({
+    'botfunctions',
+    'memorytool',
+    'docstoretool',
+    'fastmailtool',
+    'cal',
+    'imagetool',
+    'conversationsearchtool',
+    'filesearchtool',
+    'subtasktool',
+})
+
+
+def __getattr__(name: str):
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'botfunctions',
@@ -17,4 +92,9 @@ __all__ = [
     'imagetool',
     'conversationsearchtool',
     'filesearchtool',
+    'subtasktool',
+    'TOOL_IMPORT_PATHS',
+    'TOOL_REGISTRY',
+    'get_available_tool_names',
+    'resolve_tool_class',
 ]
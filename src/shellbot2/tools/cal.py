@@ -1,7 +1,11 @@
 
 import logging
 import os
+import threading
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import islice
+from operator import attrgetter
 from typing import List, Dict, Optional
 from pathlib import Path
 
@@ -17,6 +21,19 @@ SCOPES = ['https://www.googleapis.com/auth/calendar']
 PERSONAL_CALENDAR_ID = 'brendanofallon@gmail.com'
 OFINDFORS_CALENDAR_ID = 'f2qpbfbfn58tsftgo07nr96rt0@group.calendar.google.com'
 
+_event_fields = attrgetter('summary', 'start', 'end', 'description', 'location')
+
+
+@lru_cache(maxsize=8)
+def _load_credentials(credentials_file: str, mtime_ns: int) -> Credentials:
+    """
+    Load service account credentials, cached by file path and modification time.
+    
+    mtime_ns is only part of the cache key, so an edited credentials file is
+    re-read instead of serving stale credentials.
+    """
+    return Credentials.from_service_account_file(credentials_file, scopes=SCOPES)
+
 
 class Calendar:
     """
@@ -53,10 +70,12 @@ class Calendar:
             raise FileNotFoundError(f"Credentials file not found: {credentials_file}")
         
         self.credentials_file = Path(credentials_file)
-        self.creds = Credentials.from_service_account_file(
-            str(self.credentials_file), scopes=SCOPES
+        self.creds = _load_credentials(
+            str(self.credentials_file.resolve()), self.credentials_file.stat().st_mtime_ns
         )
-        logger.info(f"CalendarTool initialized with credentials file: {self.credentials_file}")
+        # Per-thread {calendar name: GoogleCalendar}; see _get_client
+        self._local = threading.local()
+        logger.info("CalendarTool initialized with credentials file: %s", self.credentials_file)
     
     def _get_calendar_id(self, calendar_name: str) -> str:
         """
@@ -78,6 +97,32 @@ class Calendar:
             )
         return self.CALENDAR_IDS[calendar_name]
     
+    def _get_client(self, calendar_name: str) -> GoogleCalendar:
+        """
+        Get the GoogleCalendar client for a calendar, creating it on first use.
+        
+        Clients are cached per calendar so the API discovery document and
+        authorized HTTP session are built once and reused across calls. The
+        cache is per thread, since the underlying httplib2.Http is not
+        thread-safe and tool calls may run in parallel on worker threads.
+        
+        Args:
+            calendar_name: Name of the calendar ('personal' or 'ofindfors')
+        
+        Returns:
+            The GoogleCalendar client for the calendar
+        """
+        clients = getattr(self._local, 'clients', None)
+        if clients is None:
+            clients = self._local.clients = {}
+        client = clients.get(calendar_name)
+        if client is None:
+            client = GoogleCalendar(
+                self._get_calendar_id(calendar_name), credentials=self.creds
+            )
+            clients[calendar_name] = client
+        return client
+    
     def get_events(
         self,
         calendar_name: str,
@@ -98,8 +143,7 @@ class Calendar:
             List of event dictionaries with keys: summary, start, end, description, location
         """
         try:
-            calendar_id = self._get_calendar_id(calendar_name)
-            calendar = GoogleCalendar(calendar_id, credentials=self.creds)
+            calendar = self._get_client(calendar_name)
             
             # Default time_min to now if not provided
             if time_min is None:
@@ -109,33 +153,41 @@ class Calendar:
             if time_max is None:
                 time_max = time_min + timedelta(days=7)
             
-            # Get events
-            events = calendar.get_events(time_min=time_min, time_max=time_max)
+            # Get events in start order, letting the API cap the page size so we
+            # don't fetch pages that would be discarded
+            query_kwargs = {}
+            if max_results:
+                query_kwargs['maxResults'] = max_results
+            events = calendar.get_events(
+                time_min=time_min,
+                time_max=time_max,
+                single_events=True,
+                order_by='startTime',
+                **query_kwargs
+            )
+            if max_results:
+                events = islice(events, max_results)
             
             # Convert to list of dictionaries
-            event_list = []
-            for event in events:
-                event_dict = {
-                    'summary': event.summary or '(No title)',
-                    'start': str(event.start) if event.start else None,
-                    'end': str(event.end) if event.end else None,
-                    'description': event.description or '',
-                    'location': event.location or ''
+            event_list = [
+                {
+                    'summary': summary or '(No title)',
+                    'start': str(start) if start else None,
+                    'end': str(end) if end else None,
+                    'description': description or '',
+                    'location': location or ''
                 }
-                event_list.append(event_dict)
-                
-                # Limit results if max_results is specified
-                if max_results and len(event_list) >= max_results:
-                    break
+                for summary, start, end, description, location in map(_event_fields, events)
+            ]
             
             logger.info(
-                f"Retrieved {len(event_list)} events from calendar '{calendar_name}' "
-                f"between {time_min} and {time_max}"
+                "Retrieved %d events from calendar '%s' between %s and %s",
+                len(event_list), calendar_name, time_min, time_max
             )
             return event_list
             
         except Exception as e:
-            logger.error(f"Error retrieving events from calendar '{calendar_name}': {e}")
+            logger.error("Error retrieving events from calendar '%s': %s", calendar_name, e)
             raise
     
     def create_event(
@@ -171,8 +223,7 @@ class Calendar:
             )
         
         try:
-            calendar_id = self._get_calendar_id(calendar_name)
-            calendar = GoogleCalendar(calendar_id, credentials=self.creds)
+            calendar = self._get_client(calendar_name)
             
             # Create event object
             event = Event(
@@ -187,8 +238,8 @@ class Calendar:
             created_event = calendar.add_event(event)
             
             logger.info(
-                f"Created event '{summary}' in calendar '{calendar_name}' "
-                f"from {start} to {end}"
+                "Created event '%s' in calendar '%s' from %s to %s",
+                summary, calendar_name, start, end
             )
             
             return {
@@ -201,7 +252,7 @@ class Calendar:
             }
             
         except Exception as e:
-            logger.error(f"Error creating event in calendar '{calendar_name}': {e}")
+            logger.error("Error creating event in calendar '%s': %s", calendar_name, e)
             raise
 
 
@@ -307,19 +358,9 @@ class CalendarTool:
         Raises:
             ValueError: If the string is not in valid ISO 8601 format
         """
-        
-        # Handle with or without timezone
-        if 'T' in time_str:
-            # Try parsing with timezone
-            try:
-                return datetime.fromisoformat(time_str.replace('Z', '+00:00'))
-            except ValueError:
-                # Try without timezone
-                return datetime.fromisoformat(time_str)
-        else:
-            # Date only, assume start of day
-            return datetime.fromisoformat(time_str)
-        
+        # fromisoformat accepts a trailing 'Z', an explicit offset, no timezone,
+        # or a bare date (start of day) on Python 3.11+
+        return datetime.fromisoformat(time_str)
     
     def __call__(self, **kwargs):
         operation = kwargs.get("operation")
@@ -437,7 +478,7 @@ class CalendarTool:
             except ValueError as e:
                 return f"Error: {e}"
             except Exception as e:
-                logger.error(f"Error creating event: {e}")
+                logger.error("Error creating event: %s", e)
                 return f"Error creating event: {e}"
         
         else:
@@ -1,15 +1,83 @@
 import mixedbread as mxbai
 import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import queue
 import tempfile
+import threading
+import time
 import json
+from typing import BinaryIO, Iterable
 
 from shellbot2.tools.util import classproperty
 
+# Size of the pieces a download is read and written in
+DOWNLOAD_CHUNK_SIZE = 128 * 1024
+# Number of search results kept, and how long (seconds) they stay valid. The
+# TTL is short because uploads from other processes can't invalidate the cache;
+# it only needs to cover repeated searches within one agent turn.
+SEARCH_CACHE_SIZE = 512
+SEARCH_CACHE_TTL = 30
+SEARCH_TOP_K = 5
+# Uploaded files are ingested asynchronously, so a store's searches bypass the
+# cache for this many seconds after an upload to it
+SEARCH_INGEST_GRACE = 600
+
+# Search results shared by every DocStoreTool in the process:
+# (store_id, store epoch, top_k, normalized query) -> (expiry time, formatted results).
+# Uploading to a store bumps its epoch, so older entries for it stop matching
+# and age out of the LRU.
+_search_cache: OrderedDict[tuple[str, int, int, str], tuple[float, str]] = OrderedDict()
+_store_epochs: dict[str, int] = {}
+# store_id -> time.monotonic() of the most recent upload to it from this process
+_store_uploads: dict[str, float] = {}
+_search_cache_lock = threading.Lock()
+
 
 def format_data_chunk(chunk) -> str:
     return json.dumps(chunk.to_json(), indent=2)
 
+
+def normalize_query(query: str) -> str:
+    """Fold case and collapse whitespace so trivially different queries share a cache entry."""
+    return " ".join(query.casefold().split())
+
+
+def write_chunks_prefetched(chunks: Iterable[bytes], f: BinaryIO) -> None:
+    """
+    Write chunks to f while a worker thread fetches the ones after them.
+    
+    At most two chunks are buffered, so the network and the disk are kept busy
+    at the same time without reading far ahead of the writer. Exceptions from
+    either side are re-raised here.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=2)
+    done = object()
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for chunk in chunks:
+                if stop.is_set():
+                    break
+                buffer.put(chunk)
+        finally:
+            buffer.put(done)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        producer = pool.submit(produce)
+        try:
+            while (chunk := buffer.get()) is not done:
+                f.write(chunk)
+        except BaseException:
+            # Let the producer finish so it isn't left blocked on a full buffer
+            stop.set()
+            while buffer.get() is not done:
+                pass
+            raise
+        producer.result()
+
 class DocStoreTool:
     def __init__(self, store_id: str = None):
         self.mixedbread = mxbai.Mixedbread(api_key=os.getenv("MIXEDBREAD_API_KEY"))
@@ -22,6 +90,42 @@ class DocStoreTool:
         # To get a path to a suitable directory for temporary files (like /tmp), use tempfile.gettempdir()
         self.download_dir = os.getenv("SHELLBOT_DOWNLOAD_DIR", "~/Downloads")
 
+    def _search(self, query: str, top_k: int = SEARCH_TOP_K) -> str:
+        """
+        Search the store, reusing recent results for the same normalized query.
+        
+        Results are cached for SEARCH_CACHE_TTL seconds in a process-wide LRU
+        of SEARCH_CACHE_SIZE entries, and are invalidated by uploads to the store.
+        For SEARCH_INGEST_GRACE seconds after an upload the store isn't cached
+        at all, since the new file only becomes searchable once it is ingested.
+        """
+        normalized = normalize_query(query)
+        with _search_cache_lock:
+            key = (self.store_id, _store_epochs.get(self.store_id, 0), top_k, normalized)
+            uploaded_at = _store_uploads.get(self.store_id)
+            use_cache = uploaded_at is None or time.monotonic() - uploaded_at >= SEARCH_INGEST_GRACE
+            cached = _search_cache.get(key) if use_cache else None
+            if cached is not None and cached[0] > time.monotonic():
+                _search_cache.move_to_end(key)
+                return cached[1]
+
+        results = self.mixedbread.stores.search(query=query, store_identifiers=[self.store_id], top_k=top_k)
+        formatted = "\n==========\n".join([format_data_chunk(chunk) for chunk in results.data])
+        if not use_cache:
+            return formatted
+        with _search_cache_lock:
+            _search_cache[key] = (time.monotonic() + SEARCH_CACHE_TTL, formatted)
+            _search_cache.move_to_end(key)
+            while len(_search_cache) > SEARCH_CACHE_SIZE:
+                _search_cache.popitem(last=False)
+        return formatted
+
+    def _invalidate_search_cache(self) -> None:
+        """Make cached search results for this store stale and stop caching it while the upload is ingested."""
+        with _search_cache_lock:
+            _store_epochs[self.store_id] = _store_epochs.get(self.store_id, 0) + 1
+            _store_uploads[self.store_id] = time.monotonic()
+
     @property
     def name(self):
         return "document-store"
@@ -78,19 +182,21 @@ class DocStoreTool:
             query = kwargs.get('query')
             if not query:
                 return f"The function {self.name} with operation {op} requires a 'query' keyword argument, but didn't get one"
-            results = self.mixedbread.stores.search(query=query, store_identifiers=[self.store_id], top_k=5)
-            return "\n==========\n".join([format_data_chunk(chunk) for chunk in results.data])
+            return self._search(query)
         elif op == "download":
             file_id = kwargs.get('file_id')
-            response = self.mixedbread.files.content(file_id)
             filename = kwargs.get('filename')
             destination_dir = kwargs.get('destination_dir', tempfile.gettempdir())
             if not os.path.exists(destination_dir):
                 return f"Destination directory {destination_dir} does not exist"
             destination_path = os.path.join(destination_dir, filename)
-            with open(destination_path, "wb") as f:
-                for chunk in response.iter_bytes():
-                    f.write(chunk)
+            # Stream the body rather than loading it into memory first, and
+            # write it in large chunks to keep the number of write calls down
+            with self.mixedbread.files.with_streaming_response.content(file_id) as response:
+                with open(destination_path, "wb") as f:
+                    write_chunks_prefetched(
+                        response.iter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE), f
+                    )
             return f"File {filename} downloaded to {destination_path}"
         elif op == "upload":
             file_path = kwargs.get('file_path')
@@ -103,6 +209,8 @@ class DocStoreTool:
                 store_identifier=self.store_id,
                 file=Path(file_path),
             )
+            # New content may change search results
+            self._invalidate_search_cache()
             return f"Uploaded file {filename}, response: {res}"
         elif op == "list":
             results = self.mixedbread.stores.files.list(store_identifier=self.store_id, limit=100)
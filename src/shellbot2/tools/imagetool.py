@@ -1,13 +1,47 @@
 import os
+import sys
 import tempfile
 import subprocess
 import base64
+from functools import lru_cache
 from typing import Optional
 
 from google import genai
 from shellbot2.tools.util import classproperty
 
 
+@lru_cache(maxsize=4)
+def _get_client(api_key: str) -> genai.Client:
+    """Return a genai.Client shared by every ImageTool using this API key, so its HTTP connections are reused."""
+    return genai.Client(api_key=api_key)
+
+
+def _write_bytes(path: str, data: bytes) -> None:
+    """Write data to path with raw os.write calls, without a buffered file object or extra copies."""
+    view = memoryview(data)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
+
+def _open_in_viewer(path: str) -> None:
+    """Open path in the platform's default viewer without waiting for it."""
+    if sys.platform == "win32":
+        os.startfile(path)
+        return
+    opener = "open" if sys.platform == "darwin" else "xdg-open"
+    subprocess.Popen(
+        [opener, path],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
 class ImageTool:
     """
     Tool for generating images from text prompts using Google's Gemini image generation API.
@@ -25,7 +59,7 @@ class ImageTool:
         if not api_key:
             raise ValueError("Google API key is required. Set GEMINI_API_KEY env var or pass api_key parameter.")
         
-        self.client = genai.Client(api_key=api_key)
+        self.client = _get_client(api_key)
     
     @property
     def name(self):
@@ -81,9 +115,17 @@ class ImageTool:
             contents=[prompt],
         )
 
-        for part in response.parts:
-            if part.inline_data is not None:
-                image_bytes = part.as_image().image_bytes
+        # Keep every image the model returned, not just the last one. The raw
+        # bytes come straight from inline_data, without building an Image first.
+        images = [
+            part.inline_data.data
+            for part in response.parts or []
+            if part.inline_data is not None
+            and part.inline_data.data
+            and (part.inline_data.mime_type or '').startswith('image/')
+        ]
+        if not images:
+            return f"No image was generated for the prompt. Model response: {response.text}"
             
         # Determine the destination path
         if dest_path is None:
@@ -91,15 +133,20 @@ class ImageTool:
             dest_path = temp_file.name
             temp_file.close()
         
-        # Save the image
-        with open(dest_path, 'wb') as image_file:
-            image_file.write(image_bytes)
+        # Save the images: the first to dest_path, any others alongside it
+        root, ext = os.path.splitext(dest_path)
+        paths = [dest_path] + [f"{root}.{i}{ext}" for i in range(1, len(images))]
+        for path, image_bytes in zip(paths, images):
+            _write_bytes(path, image_bytes)
         
-        # Open the image if requested
+        # Open the images if requested
         if open_image:
-            subprocess.run(['open', dest_path], check=True)
+            for path in paths:
+                _open_in_viewer(path)
         
-        return f"Image generated and saved to: {dest_path}"
+        if len(paths) == 1:
+            return f"Image generated and saved to: {dest_path}"
+        return f"{len(paths)} images generated and saved to: {', '.join(paths)}"
             
 
 
@@ -5,15 +5,69 @@ Keys are short, human-readable descriptions stored as filenames.
 Values are larger text blobs stored as file contents.
 """
 
+import difflib
 import logging
 import os
+import re
+import tempfile
+import threading
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 from shellbot2.tools.util import classproperty
 
+# Path separators and other characters that aren't filesystem-safe, mapped to '_'
+_SANITIZE_TABLE = str.maketrans({char: '_' for char in '/\\:*?"<>|\n\r\t'})
+# Keys that _sanitize_key would return unchanged: ASCII letters, digits, '-',
+# '_', spaces and single dots, not starting or ending with '_', '.' or a space
+_SAFE_KEY_RE = re.compile(r'[A-Za-z0-9-](?:(?:[A-Za-z0-9_ -]|\.(?!\.))*[A-Za-z0-9-])?')
+# Maximum number of key -> path lookups remembered per MemoryTool
+_PATH_CACHE_SIZE = 256
+
+def _atomic_write(path: str, value: str, durable: bool = False) -> None:
+    """
+    Replace the contents of path with value so readers see either the old or new contents.
+    
+    The value is written to a uniquely named temporary file next to path,
+    optionally fsync'd, then renamed over path, so concurrent writers to the
+    same key don't clobber each other's temporary file. With durable=True the
+    directory is fsync'd too, so the rename itself survives a crash.
+    Newlines are translated as a text-mode write would, so the file matches
+    one written by open(path, 'w').
+    """
+    if os.linesep != '\n':
+        value = value.replace('\n', os.linesep)
+    data = memoryview(value.encode('utf-8'))
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".tmp")
+    try:
+        try:
+            # mkstemp creates the file owner-only; match the other memory files
+            os.chmod(tmp_path, 0o644)
+            while data:
+                written = os.write(fd, data)
+                data = data[written:]
+            if durable:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    if durable and os.name == 'posix':
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
 class MemoryTool:
     """
     A filesystem-backed key-value store for storing and retrieving text data.
@@ -29,11 +83,22 @@ class MemoryTool:
         Args:
             storage_dir: Directory to store key-value pairs. Defaults to ~/.shellbot/memory
         """
-        self.storage_dir = storage_dir
         if storage_dir is None:
             self.storage_dir = Path(os.getenv("SHELLBOT_DATADIR", "~/.shellbot2")).expanduser() / "memory"
+        else:
+            self.storage_dir = Path(storage_dir)
         
         self.storage_dir.mkdir(parents=True, exist_ok=True)
+        # Resolved once, as a plain string, so per-key paths need neither a
+        # realpath() call nor Path objects
+        self._resolved_storage = os.path.realpath(self.storage_dir)
+        # key -> validated file path, evicted oldest-first past _PATH_CACHE_SIZE
+        self._path_cache: Dict[str, str] = {}
+        # Tool calls may run on several threads; guards eviction from _path_cache
+        self._path_cache_lock = threading.Lock()
+        # file path -> ((st_mtime_ns, st_size), value); a stat that still matches
+        # lets get() skip re-reading the file
+        self._value_cache: Dict[str, Tuple[Tuple[int, int], str]] = {}
         logger.info(f"MemoryTool initialized with storage directory: {self.storage_dir}")
     
     def _sanitize_key(self, key: str) -> str:
@@ -43,13 +108,15 @@ class MemoryTool:
         Replaces characters that aren't filesystem-safe with underscores.
         Ensures the key cannot reference files outside the storage directory.
         """
+        # Most keys are already safe, so skip the passes below for them
+        if _SAFE_KEY_RE.fullmatch(key):
+            return key
+        
         # First strip all whitespace and dots from edges
         sanitized = key.strip()
         
-        # Replace path separators and other problematic characters
-        invalid_chars = ['/', '\\', ':', '*', '?', '"', '<', '>', '|', '\n', '\r', '\t']
-        for char in invalid_chars:
-            sanitized = sanitized.replace(char, '_')
+        # Replace path separators and other problematic characters in one pass
+        sanitized = sanitized.translate(_SANITIZE_TABLE)
         
         # Remove leading/trailing whitespace, underscores, and dots again after replacements
         sanitized = sanitized.strip('._  ')
@@ -75,33 +142,46 @@ class MemoryTool:
         
         return sanitized
     
-    def _get_file_path(self, key: str) -> Path:
+    def _get_file_path(self, key: str) -> str:
         """
         Get the full file path for a given key.
         
-        Ensures the resulting path is within the storage directory to prevent
-        path traversal attacks.
+        The sanitized key is a single path component (no separators, no '..'),
+        so joining it onto the resolved storage directory cannot escape it and
+        no per-call resolve is needed. Results are cached per key, since
+        sanitizing is deterministic and the storage directory doesn't move.
         """
-        sanitized_key = self._sanitize_key(key)
-        file_path = self.storage_dir / f"{sanitized_key}.txt"
+        cached = self._path_cache.get(key)
+        if cached is not None:
+            return cached
         
-        # Resolve to absolute path and verify it's within storage_dir
-        try:
-            resolved_path = file_path.resolve()
-            resolved_storage = self.storage_dir.resolve()
-            
-            # Check if the resolved path is within the storage directory
-            # Use relative_to to verify containment
-            resolved_path.relative_to(resolved_storage)
-            
-        except (ValueError, RuntimeError) as e:
-            # relative_to raises ValueError if path is not relative to storage_dir
+        sanitized_key = self._sanitize_key(key)
+        # Cheap check on the final name that it is still a single component
+        if (
+            '/' in sanitized_key
+            or os.sep in sanitized_key
+            or sanitized_key in ('.', '..')
+        ):
             raise ValueError(
                 f"Invalid key: resolved path would be outside storage directory"
-            ) from e
-        
+            )
+        file_path = os.path.join(self._resolved_storage, f"{sanitized_key}.txt")
+        
+        with self._path_cache_lock:
+            if len(self._path_cache) >= _PATH_CACHE_SIZE:
+                # Dicts keep insertion order, so the first key is the oldest entry
+                self._path_cache.pop(next(iter(self._path_cache), None), None)
+            self._path_cache[key] = file_path
         return file_path
     
+    def _remember_value(self, file_path: str, value: str) -> None:
+        """Record the value just written to file_path along with its stat signature."""
+        st = os.stat(file_path)
+        # Cache what reading the file back in text mode returns, since get()
+        # translates '\r\n' and '\r' to '\n' on a cache miss
+        value = value.replace('\r\n', '\n').replace('\r', '\n')
+        self._value_cache[file_path] = ((st.st_mtime_ns, st.st_size), value)
+    
     def list_keys(self) -> List[str]:
         """
         List all keys currently stored.
@@ -139,23 +219,29 @@ class MemoryTool:
         try:
             file_path = self._get_file_path(key)
             
-            if file_path.exists():
+            if os.path.exists(file_path):
                 raise ValueError(f"Key '{key}' already exists. Use replace() to update existing keys.")
             
-            file_path.write_text(value, encoding='utf-8')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(value)
+            self._remember_value(file_path, value)
             logger.info(f"Inserted new key: {key}")
             return True
         except Exception as e:
             logger.error(f"Error inserting key '{key}': {e}")
             raise
     
-    def replace(self, key: str, value: str) -> bool:
+    def replace(self, key: str, value: str, durable: bool = False) -> bool:
         """
         Replace an existing key-value pair. Fails if the key doesn't exist.
         
+        The new value is written atomically, so a crash mid-write leaves the
+        old value in place rather than a truncated file.
+        
         Args:
             key: The key to replace
             value: The new value to store
+            durable: If True, fsync the new value before it replaces the old one
         
         Returns:
             True if replacement was successful
@@ -166,10 +252,11 @@ class MemoryTool:
         try:
             file_path = self._get_file_path(key)
             
-            if not file_path.exists():
+            if not os.path.exists(file_path):
                 raise ValueError(f"Key '{key}' does not exist. Use insert() to create new keys.")
             
-            file_path.write_text(value, encoding='utf-8')
+            _atomic_write(file_path, value, durable=durable)
+            self._remember_value(file_path, value)
             logger.info(f"Replaced key: {key}")
             return True
         except Exception as e:
@@ -192,10 +279,20 @@ class MemoryTool:
         try:
             file_path = self._get_file_path(key)
             
-            if not file_path.exists():
-                raise ValueError(f"Key '{key}' does not exist")
+            try:
+                st = os.stat(file_path)
+            except FileNotFoundError:
+                self._value_cache.pop(file_path, None)
+                raise ValueError(f"Key '{key}' does not exist") from None
             
-            value = file_path.read_text(encoding='utf-8')
+            signature = (st.st_mtime_ns, st.st_size)
+            cached = self._value_cache.get(file_path)
+            if cached is not None and cached[0] == signature:
+                value = cached[1]
+            else:
+                with open(file_path, encoding='utf-8') as f:
+                    value = f.read()
+                self._value_cache[file_path] = (signature, value)
             logger.info(f"Retrieved key: {key}")
             return value
         except Exception as e:
@@ -218,10 +315,11 @@ class MemoryTool:
         try:
             file_path = self._get_file_path(key)
             
-            if not file_path.exists():
+            if not os.path.exists(file_path):
                 raise ValueError(f"Key '{key}' does not exist")
             
-            file_path.unlink()
+            os.unlink(file_path)
+            self._value_cache.pop(file_path, None)
             logger.info(f"Deleted key: {key}")
             return True
         except Exception as e:
@@ -240,11 +338,42 @@ class MemoryTool:
         """
         try:
             file_path = self._get_file_path(key)
-            return file_path.exists()
+            return os.path.exists(file_path)
         except Exception as e:
             logger.error(f"Error checking existence of key '{key}': {e}")
             return False
     
+    def get_fuzzy(self, key: str, threshold: int = 90) -> Optional[Tuple[str, str]]:
+        """
+        Retrieve the value for the stored key that best matches key.
+        
+        An exact match is tried first; otherwise keys are compared with
+        difflib after folding case and treating '_', '-' and spaces alike, so
+        "project notes" finds "project_notes".
+        
+        Args:
+            key: The key to look up
+            threshold: Minimum similarity, 0-100, for a fuzzy match
+        
+        Returns:
+            A (matched key, value) tuple, or None if nothing is similar enough
+        """
+        # Check first so an expected miss isn't logged as an error by get()
+        if self.exists(key):
+            return key, self.get(key)
+        
+        def normalize(k: str) -> str:
+            return " ".join(k.casefold().replace('_', ' ').replace('-', ' ').split())
+        
+        candidates = {normalize(k): k for k in self.list_keys()}
+        matches = difflib.get_close_matches(
+            normalize(key), list(candidates), n=1, cutoff=threshold / 100
+        )
+        if not matches:
+            return None
+        matched_key = candidates[matches[0]]
+        return matched_key, self.get(matched_key)
+    
     def get_all(self) -> Dict[str, str]:
         """
         Retrieve all key-value pairs.
@@ -253,9 +382,18 @@ class MemoryTool:
             Dictionary of all keys and their values
         """
         try:
+            # One directory scan; entries are already inside storage_dir, so skip
+            # the per-key sanitize/resolve/exists work that get() does
+            entries = []
+            with os.scandir(self.storage_dir) as it:
+                for entry in it:
+                    if entry.name.endswith('.txt') and entry.is_file():
+                        entries.append((entry.name[:-4], entry.path))
+            
             result = {}
-            for key in self.list_keys():
-                result[key] = self.get(key)
+            for key, path in sorted(entries):
+                with open(path, encoding='utf-8') as f:
+                    result[key] = f.read()
             
             logger.info(f"Retrieved all {len(result)} key-value pairs")
             return result
@@ -290,6 +428,7 @@ class MemoryFunction:
         - 'insert': Insert a new key-value pair (fails if key exists)
         - 'replace': Replace an existing key-value pair (fails if key doesn't exist)
         - 'get': Retrieve the value for a given key
+        - 'fuzzy_get': Retrieve the value for the closest matching key, for when the exact key isn't known
         - 'delete': Delete a key-value pair
         
         Keys should be short, human-readable descriptions of the value text, like "how_to_build_jenever" or "favorite_space_westerns".
@@ -304,7 +443,7 @@ class MemoryFunction:
                 "operation": {
                     "type": "string",
                     "description": "The operation to perform",
-                    "enum": ["list", "insert", "replace", "get", "delete", "exists"]
+                    "enum": ["list", "insert", "replace", "get", "fuzzy_get", "delete", "exists"]
                 },
                 "key": {
                     "type": "string",
@@ -352,6 +491,15 @@ class MemoryFunction:
                 value = self.memory_tool.get(key)
                 return f"Value for key '{key}':\n{value}"
             
+            elif operation == "fuzzy_get":
+                if not key:
+                    return "Error: 'key' parameter is required for fuzzy_get operation"
+                match = self.memory_tool.get_fuzzy(key)
+                if match is None:
+                    return f"No key similar to '{key}' found"
+                matched_key, value = match
+                return f"Value for key '{matched_key}':\n{value}"
+            
             elif operation == "delete":
                 if not key:
                     return "Error: 'key' parameter is required for delete operation"
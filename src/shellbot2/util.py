@@ -0,0 +1,28 @@
+"""
+Lightweight shared helpers.
+
+Kept free of the LLM / tool dependencies so that commands which only need
+configuration (e.g. `daemon ask`) start quickly.
+"""
+
+from copy import deepcopy
+from functools import lru_cache
+from pathlib import Path
+
+import yaml
+
+
+@lru_cache(maxsize=8)
+def _parse_conf_file(conf_path: str, mtime_ns: int):
+    """Parse agent_conf.yaml, cached on (resolved path, mtime) so edits are still picked up."""
+    with open(conf_path, "r") as f:
+        return yaml.safe_load(f)
+
+
+def load_conf(datadir: Path):
+    conf_file = Path(datadir) / "agent_conf.yaml"
+    if not conf_file.exists():
+        raise FileNotFoundError(f"Agent configuration file not found: {conf_file}")
+    conf = _parse_conf_file(str(conf_file.resolve()), conf_file.stat().st_mtime_ns)
+    # Callers may mutate the result (e.g. tool kwargs), so never hand out the cached object
+    return deepcopy(conf)
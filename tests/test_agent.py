@@ -1,14 +1,24 @@
 import pytest
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from types import SimpleNamespace
+from unittest.mock import MagicMock
 from shellbot2.agent import ShellBot3
 
-@patch('shellbot2.agent.load_conf')
-@patch('shellbot2.agent.MessageHistory')
-@patch('shellbot2.agent.ShellBot3._initialize_agent')
-def test_dynamic_tool_loading(mock_init_agent, mock_msg_history, mock_load_conf, tmp_path):
-    # Configure mock
-    mock_load_conf.return_value = {
+
+@pytest.fixture
+def agent_mocks(monkeypatch):
+    """Stub out message history and agent construction for ShellBot3."""
+    mocks = SimpleNamespace(
+        message_history=MagicMock(),
+        init_agent=MagicMock(),
+    )
+    monkeypatch.setattr('shellbot2.agent.MessageHistory', mocks.message_history)
+    monkeypatch.setattr(ShellBot3, '_initialize_agent', mocks.init_agent)
+    return mocks
+
+
+def test_dynamic_tool_loading(agent_mocks, tmp_path):
+    conf = {
         'tools': [
             'shell',
             {'document-store': {'store_id': 'test-store-id'}},
@@ -17,12 +27,12 @@ def test_dynamic_tool_loading(mock_init_agent, mock_msg_history, mock_load_conf,
     }
     
     # Initialize bot
-    bot = ShellBot3(datadir=tmp_path)
+    bot = ShellBot3(datadir=tmp_path, conf=conf)
     
     # Check that tools were created based on config
     # We mocked _initialize_agent, so we can see what tools were passed to it
-    assert mock_init_agent.called
-    tools_passed = mock_init_agent.call_args[0][1]
+    assert agent_mocks.init_agent.called
+    tools_passed = agent_mocks.init_agent.call_args[0][1]
     
     # We should have exactly 3 tools loaded
     assert len(tools_passed) == 3
@@ -32,10 +42,7 @@ def test_dynamic_tool_loading(mock_init_agent, mock_msg_history, mock_load_conf,
     assert 'python' in tool_names
     assert 'document-store' in tool_names
 
-@patch('shellbot2.agent.load_conf')
-@patch('shellbot2.agent.MessageHistory')
-@patch('shellbot2.agent.ShellBot3._initialize_agent')
-def test_custom_tool_loading(mock_init_agent, mock_msg_history, mock_load_conf, tmp_path):
+def test_custom_tool_loading(agent_mocks, tmp_path):
     # Create custom tool dir and file
     tools_dir = tmp_path / "tools"
     tools_dir.mkdir()
@@ -69,8 +76,7 @@ class MyCustomTool:
 """
     (tools_dir / "my_custom_tool.py").write_text(custom_tool_code)
     
-    # Configure mock
-    mock_load_conf.return_value = {
+    conf = {
         'tools': [
             'shell',
             'my-custom-tool'
@@ -78,11 +84,11 @@ class MyCustomTool:
     }
     
     # Initialize bot
-    bot = ShellBot3(datadir=tmp_path)
+    bot = ShellBot3(datadir=tmp_path, conf=conf)
     
     # Check that tools were created based on config
-    assert mock_init_agent.called
-    tools_passed = mock_init_agent.call_args[0][1]
+    assert agent_mocks.init_agent.called
+    tools_passed = agent_mocks.init_agent.call_args[0][1]
     
     # We should have exactly 2 tools loaded
     assert len(tools_passed) == 2
@@ -0,0 +1,44 @@
+import threading
+
+import pytest
+
+from shellbot2.tools import cal
+from shellbot2.tools.cal import Calendar
+
+
+class FakeGoogleCalendar:
+    def __init__(self, calendar_id, credentials=None):
+        self.calendar_id = calendar_id
+
+
+@pytest.fixture
+def calendar(tmp_path, monkeypatch):
+    credentials_file = tmp_path / "credentials.json"
+    credentials_file.write_text("{}")
+    monkeypatch.setattr(cal, "_load_credentials", lambda path, mtime_ns: object())
+    monkeypatch.setattr(cal, "GoogleCalendar", FakeGoogleCalendar)
+    return Calendar(credentials_file=str(credentials_file))
+
+
+def test_client_reused_within_a_thread(calendar):
+    client = calendar._get_client("personal")
+
+    assert calendar._get_client("personal") is client
+    assert client.calendar_id == cal.PERSONAL_CALENDAR_ID
+    assert calendar._get_client("ofindfors") is not client
+
+
+def test_client_not_shared_between_threads(calendar):
+    main_client = calendar._get_client("personal")
+    thread_clients = []
+
+    def use_client():
+        thread_clients.append(calendar._get_client("personal"))
+        thread_clients.append(calendar._get_client("personal"))
+
+    thread = threading.Thread(target=use_client)
+    thread.start()
+    thread.join()
+
+    assert thread_clients[0] is thread_clients[1]
+    assert thread_clients[0] is not main_client
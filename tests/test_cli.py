@@ -0,0 +1,55 @@
+import argparse
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from shellbot2.cli import COMMAND_HANDLERS, DAEMON_HANDLERS, build_parser, run_event_loop
+
+
+def _subcommand_names(parser: argparse.ArgumentParser) -> set[str]:
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            return set(action.choices)
+    return set()
+
+
+def test_every_subcommand_has_a_handler():
+    parser = build_parser()
+    commands = _subcommand_names(parser)
+
+    assert commands - {'daemon'} == set(COMMAND_HANDLERS)
+
+    daemon_parser = next(
+        action.choices['daemon']
+        for action in parser._actions
+        if isinstance(action, argparse._SubParsersAction)
+    )
+    assert _subcommand_names(daemon_parser) == set(DAEMON_HANDLERS)
+
+
+async def _answer():
+    return 42
+
+
+def test_run_event_loop_without_uvloop(monkeypatch):
+    # A None entry makes `import uvloop` raise ImportError
+    monkeypatch.setitem(sys.modules, "uvloop", None)
+
+    run_event_loop(_answer())
+
+
+@pytest.mark.parametrize("has_run", [True, False])
+def test_run_event_loop_with_uvloop(monkeypatch, has_run):
+    calls = []
+    fake_uvloop = SimpleNamespace(install=lambda: calls.append("install"))
+    if has_run:
+        def run(coro):
+            calls.append("run")
+            coro.close()
+        fake_uvloop.run = run
+    monkeypatch.setitem(sys.modules, "uvloop", fake_uvloop)
+
+    run_event_loop(_answer())
+
+    assert calls == (["run"] if has_run else ["install"])
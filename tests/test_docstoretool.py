@@ -0,0 +1,117 @@
+import io
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from shellbot2.tools import docstoretool
+from shellbot2.tools.docstoretool import DocStoreTool, write_chunks_prefetched
+
+
+@pytest.fixture
+def tool(monkeypatch):
+    """A DocStoreTool talking to a fake Mixedbread client, with an empty search cache."""
+    monkeypatch.setenv("MIXEDBREAD_API_KEY", "test-key")
+    monkeypatch.setattr(docstoretool, "_search_cache", type(docstoretool._search_cache)())
+    monkeypatch.setattr(docstoretool, "_store_epochs", {})
+    monkeypatch.setattr(docstoretool, "_store_uploads", {})
+
+    tool = DocStoreTool(store_id="store-1")
+    tool.mixedbread = MagicMock()
+    chunk = SimpleNamespace(to_json=lambda: {"file_id": "f1", "text": "hello"})
+    tool.mixedbread.stores.search.return_value = SimpleNamespace(data=[chunk])
+    return tool
+
+
+def test_write_chunks_prefetched_writes_in_order():
+    chunks = [b"a" * 10, b"b" * 3, b"", b"c"]
+    f = io.BytesIO()
+
+    write_chunks_prefetched(iter(chunks), f)
+
+    assert f.getvalue() == b"".join(chunks)
+
+
+def test_write_chunks_prefetched_reraises_producer_error():
+    def chunks():
+        yield b"first"
+        raise ConnectionError("dropped")
+
+    f = io.BytesIO()
+    with pytest.raises(ConnectionError, match="dropped"):
+        write_chunks_prefetched(chunks(), f)
+    assert f.getvalue() == b"first"
+
+
+def test_write_chunks_prefetched_reraises_writer_error():
+    class FullDisk(io.BytesIO):
+        def write(self, data):
+            raise OSError("disk full")
+
+    # More chunks than the buffer holds, so the producer would block if the
+    # writer didn't drain it on failure
+    chunks = (b"x" for _ in range(10))
+    with pytest.raises(OSError, match="disk full"):
+        write_chunks_prefetched(chunks, FullDisk())
+
+
+def test_search_reuses_results_for_normalized_query(tool):
+    first = tool(operation="search", query="Quarterly  Report")
+    second = tool(operation="search", query="quarterly report ")
+
+    assert first == second
+    assert '"file_id": "f1"' in first
+    tool.mixedbread.stores.search.assert_called_once_with(
+        query="Quarterly  Report", store_identifiers=["store-1"], top_k=docstoretool.SEARCH_TOP_K
+    )
+
+
+def test_search_cache_expires(tool, monkeypatch):
+    # Entries are stale as soon as they are stored
+    monkeypatch.setattr(docstoretool, "SEARCH_CACHE_TTL", -1)
+
+    tool(operation="search", query="report")
+    tool(operation="search", query="report")
+
+    assert tool.mixedbread.stores.search.call_count == 2
+
+
+def test_upload_invalidates_cached_search(tool, tmp_path):
+    upload = tmp_path / "notes.txt"
+    upload.write_text("contents")
+    other = DocStoreTool(store_id="store-2")
+    other.mixedbread = tool.mixedbread
+
+    tool(operation="search", query="report")
+    other(operation="search", query="report")
+    result = tool(operation="upload", file_path=str(upload))
+    tool(operation="search", query="report")
+    other(operation="search", query="report")
+
+    assert result.startswith("Uploaded file notes.txt")
+    searched = [c.kwargs["store_identifiers"] for c in tool.mixedbread.stores.search.call_args_list]
+    assert searched == [["store-1"], ["store-2"], ["store-1"]]
+
+
+def test_search_sees_upload_once_ingested(tool, tmp_path, monkeypatch):
+    upload = tmp_path / "notes.txt"
+    upload.write_text("contents")
+    search = tool.mixedbread.stores.search
+    new_chunk = SimpleNamespace(to_json=lambda: {"file_id": "f2", "text": "new"})
+
+    tool(operation="search", query="report")
+    tool(operation="upload", file_path=str(upload))
+    # Still ingesting: the store returns the old results
+    during = tool(operation="search", query="report")
+    search.return_value = SimpleNamespace(data=[new_chunk])
+    after = tool(operation="search", query="report")
+
+    assert '"file_id": "f1"' in during
+    assert '"file_id": "f2"' in after
+    assert search.call_count == 3
+
+    # Once the grace period has passed, results are cached again
+    monkeypatch.setattr(docstoretool, "SEARCH_INGEST_GRACE", 0)
+    tool(operation="search", query="report")
+    tool(operation="search", query="report")
+    assert search.call_count == 4
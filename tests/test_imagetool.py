@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from shellbot2.tools import imagetool
+from shellbot2.tools.imagetool import ImageTool, _write_bytes
+
+
+def _part(data=None, mime_type="image/png"):
+    inline_data = None if data is None else SimpleNamespace(data=data, mime_type=mime_type)
+    return SimpleNamespace(inline_data=inline_data)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """A fake genai client returned for every API key."""
+    client = MagicMock()
+    monkeypatch.setattr(imagetool, "_get_client", lambda api_key: client)
+    return client
+
+
+def _respond(client, parts, text=None):
+    client.models.generate_content.return_value = SimpleNamespace(parts=parts, text=text)
+
+
+def test_write_bytes(tmp_path):
+    path = tmp_path / "image.png"
+    path.write_bytes(b"old contents that are longer")
+
+    _write_bytes(str(path), b"\x89PNG data")
+
+    assert path.read_bytes() == b"\x89PNG data"
+
+
+def test_single_image_saved_to_dest_path(client, tmp_path):
+    _respond(client, [_part(), _part(b"png-bytes")])
+    dest = tmp_path / "out.png"
+
+    result = ImageTool(api_key="test-key")(prompt="a cat", dest_path=str(dest))
+
+    assert result == f"Image generated and saved to: {dest}"
+    assert dest.read_bytes() == b"png-bytes"
+
+
+def test_multiple_images_saved_alongside_dest_path(client, tmp_path):
+    _respond(client, [
+        _part(b"one"),
+        _part(b"caption", mime_type="text/plain"),
+        _part(b"two"),
+        _part(b"three", mime_type="image/jpeg"),
+    ])
+    dest = tmp_path / "out.png"
+
+    result = ImageTool(api_key="test-key")(prompt="cats", dest_path=str(dest))
+
+    paths = [dest, tmp_path / "out.1.png", tmp_path / "out.2.png"]
+    assert result == f"3 images generated and saved to: {', '.join(map(str, paths))}"
+    assert [p.read_bytes() for p in paths] == [b"one", b"two", b"three"]
+
+
+@pytest.mark.parametrize("parts", [[], None, [_part()], [_part(b"text", mime_type="text/plain")]])
+def test_no_image_returns_model_text(client, tmp_path, parts):
+    _respond(client, parts, text="I can't draw that")
+
+    result = ImageTool(api_key="test-key")(prompt="?", dest_path=str(tmp_path / "out.png"))
+
+    assert result == "No image was generated for the prompt. Model response: I can't draw that"
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,128 @@
+import logging
+import os
+import threading
+
+import pytest
+
+from shellbot2.tools.memorytool import MemoryTool
+
+
+@pytest.mark.parametrize("key", [
+    "../../etc/passwd",
+    "..",
+    ".",
+    "...hidden",
+    "a/../../b",
+    "..\\..\\windows",
+    "/absolute/path",
+    "  ../spaced  ",
+    "foo/..",
+])
+def test_adversarial_keys_stay_in_storage_dir(key, tmp_path):
+    memory = MemoryTool(storage_dir=tmp_path)
+
+    try:
+        file_path = memory._get_file_path(key)
+    except ValueError:
+        return
+
+    # The key must map to a single file directly inside the storage directory
+    assert os.path.dirname(file_path) == os.path.realpath(tmp_path)
+    name = os.path.basename(file_path)
+    assert name.endswith(".txt")
+    assert not name.startswith(".")
+    sanitized = name[:-len(".txt")]
+    assert "/" not in sanitized and os.sep not in sanitized
+    assert sanitized not in (".", "..")
+
+
+@pytest.mark.parametrize("key", ["project_notes", "meeting summary", "v1.2-final"])
+def test_safe_keys_are_used_as_is(key, tmp_path):
+    memory = MemoryTool(storage_dir=tmp_path)
+    memory.insert(key, "value")
+
+    assert os.path.exists(tmp_path / f"{key}.txt")
+    assert memory.get(key) == "value"
+
+
+def test_insert_replace_get_delete(tmp_path):
+    memory = MemoryTool(storage_dir=tmp_path)
+
+    memory.insert("notes", "first")
+    with pytest.raises(ValueError):
+        memory.insert("notes", "again")
+
+    memory.replace("notes", "second")
+    assert memory.get("notes") == "second"
+    assert memory.get_all() == {"notes": "second"}
+
+    memory.delete("notes")
+    assert not memory.exists("notes")
+    with pytest.raises(ValueError):
+        memory.get("notes")
+
+
+def test_get_sees_external_edits(tmp_path):
+    memory = MemoryTool(storage_dir=tmp_path)
+    memory.insert("notes", "cached")
+    assert memory.get("notes") == "cached"
+
+    (tmp_path / "notes.txt").write_text("edited elsewhere", encoding="utf-8")
+
+    assert memory.get("notes") == "edited elsewhere"
+
+
+def test_get_fuzzy_matches_near_miss_keys(tmp_path):
+    memory = MemoryTool(storage_dir=tmp_path)
+    memory.insert("project_notes", "notes")
+
+    assert memory.get_fuzzy("project_notes") == ("project_notes", "notes")
+    assert memory.get_fuzzy("Project Notes") == ("project_notes", "notes")
+    assert memory.get_fuzzy("unrelated") is None
+
+
+def test_carriage_returns_read_back_consistently(tmp_path):
+    memory = MemoryTool(storage_dir=tmp_path)
+
+    memory.insert("notes", "a\r\nb\rc")
+    assert memory.get("notes") == "a\nb\nc"
+    assert MemoryTool(storage_dir=tmp_path).get("notes") == "a\nb\nc"
+    assert memory.get_all() == {"notes": "a\nb\nc"}
+
+    memory.replace("notes", "x\r\ny\r")
+    assert memory.get("notes") == "x\ny\n"
+    assert MemoryTool(storage_dir=tmp_path).get("notes") == "x\ny\n"
+    assert memory.get_all() == {"notes": "x\ny\n"}
+
+
+def test_get_fuzzy_miss_is_not_logged_as_error(tmp_path, caplog):
+    memory = MemoryTool(storage_dir=tmp_path)
+    memory.insert("project_notes", "notes")
+
+    with caplog.at_level(logging.ERROR):
+        assert memory.get_fuzzy("project notes") == ("project_notes", "notes")
+
+    assert not [r for r in caplog.records if r.levelno >= logging.ERROR]
+
+
+def test_concurrent_replace_of_one_key(tmp_path):
+    memory = MemoryTool(storage_dir=tmp_path)
+    memory.insert("notes", "start")
+    errors = []
+
+    def writer(n):
+        for i in range(100):
+            try:
+                memory.replace("notes", f"{n}-{i}", durable=(i % 25 == 0))
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(os.listdir(tmp_path)) == ["notes.txt"]
+    assert memory.get("notes").endswith("-99")
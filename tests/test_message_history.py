@@ -0,0 +1,108 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert
+
+from shellbot2.message_history import Message, MessageHistory
+
+
+@pytest.fixture
+def history():
+    """A thread mixing standalone messages and multi-message interactions."""
+    history = MessageHistory()
+    history.add_message("t", "s1")
+    history.add_interaction("t", ["i1-a", "i1-b"])
+    history.add_message("t", "s2")
+    history.add_interaction("t", ["i2-a", "i2-b", "i2-c"])
+    history.add_message("t", "s3")
+    history.add_message("other", "elsewhere")
+    return history
+
+
+def _contents(interactions):
+    return [[m.message for m in interaction.messages] for interaction in interactions]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4])
+def test_recent_interactions_window(history, limit):
+    expected = history.get_all_interactions("t")[-limit:]
+
+    recent = history.get_recent_interactions("t", limit)
+
+    assert [i.interaction_id for i in recent] == [i.interaction_id for i in expected]
+    assert _contents(recent) == _contents(expected)
+
+
+def test_recent_interactions_window_boundaries(history):
+    assert _contents(history.get_recent_interactions("t", 3)) == [
+        ["s2"], ["i2-a", "i2-b", "i2-c"], ["s3"],
+    ]
+    assert _contents(history.get_recent_interactions("t", 4))[0] == ["i1-a", "i1-b"]
+
+
+@pytest.mark.parametrize("limit", [5, 100, 0])
+def test_recent_interactions_limit_covering_all(history, limit):
+    recent = history.get_recent_interactions("t", limit)
+
+    assert _contents(recent) == _contents(history.get_all_interactions("t"))
+    assert len(recent) == 5
+
+
+def test_recent_interactions_messages_only(history):
+    messages = history.get_recent_interactions("t", 2, messages_only=True)
+
+    assert [m.message for m in messages] == ["i2-a", "i2-b", "i2-c", "s3"]
+
+
+def test_empty_interaction_id_is_standalone():
+    history = MessageHistory()
+    now = datetime.now()
+    with history.engine.begin() as conn:
+        conn.execute(insert(Message), [
+            {"thread_id": "t", "interaction_id": "", "message": '"a"', "created_at": now},
+            {"thread_id": "t", "interaction_id": "", "message": '"b"', "created_at": now},
+        ])
+
+    recent = history.get_recent_interactions("t", 1)
+
+    assert _contents(recent) == [["b"]]
+    assert _contents(history.get_recent_interactions("t", 0)) == [["a"], ["b"]]
+
+
+def test_add_messages_returns_ids_in_order():
+    history = MessageHistory()
+    first = history.add_message("t", "before")
+
+    ids = history.add_messages("t", ["a", "b", "c"])
+
+    assert ids == [first + 1, first + 2, first + 3]
+    by_id = {m["id"]: m["message"] for m in history.get_messages("t")}
+    assert [by_id[i] for i in ids] == ["a", "b", "c"]
+    assert history.add_messages("t", []) == []
+
+
+def test_get_messages_limit_returns_most_recent_oldest_first():
+    history = MessageHistory()
+    history.add_messages("t", ["m0", "m1", "m2", "m3"])
+    history.add_message("other", "x")
+    history.add_message("t", "m4")
+
+    recent = history.get_messages("t", limit=3)
+
+    assert [m["message"] for m in recent] == ["m2", "m3", "m4"]
+    assert [m["message"] for m in history.get_messages("t")] == [
+        "m0", "m1", "m2", "m3", "m4",
+    ]
+
+
+def test_thread_ids_cache_sees_new_threads():
+    history = MessageHistory()
+    history.add_message("a", "first")
+    assert history.get_thread_ids() == ["a"]
+
+    history.add_message("b", "second")
+    assert sorted(history.get_thread_ids()) == ["a", "b"]
+
+    history.add_interaction("c", "third")
+    history.add_messages("d", ["fourth"])
+    assert sorted(history.get_thread_ids()) == ["a", "b", "c", "d"]
@@ -0,0 +1,29 @@
+import pytest
+
+from shellbot2.tools import TOOL_REGISTRY, get_available_tool_names
+
+
+def test_registry_names_match_toolnames():
+    assert get_available_tool_names() == sorted(TOOL_REGISTRY)
+    for name, tool_cls in TOOL_REGISTRY.items():
+        assert tool_cls.toolname == name
+
+
+@pytest.mark.parametrize("name", [
+    "shell",
+    "reader",
+    "clipboard",
+    "python",
+    "memory",
+    "file_search",
+    "text_replace",
+])
+def test_simple_tool_factory_returns_instance(name, tmp_path, monkeypatch):
+    # MemoryFunction stores under SHELLBOT_DATADIR by default
+    monkeypatch.setenv("SHELLBOT_DATADIR", str(tmp_path))
+
+    tool = TOOL_REGISTRY[name]()
+
+    assert tool.name == name
+    assert tool.description
+    assert tool.parameters["type"] == "object"